@@ -0,0 +1,10 @@
+import multiprocessing
+import os
+
+# gevent workers monkey-patch the stdlib before the app is imported, so
+# MongoDB, Discord and other blocking I/O yield instead of pinning a worker
+worker_class = "gevent"
+# One process per core is enough with gevent; each worker keeps its own Mongo
+# pool and in-process caches, so fewer workers means better hit rates
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_connections = int(os.environ.get("WORKER_CONNECTIONS", 1000))
@@ -1,29 +1,56 @@
 import os
-import json
 import time
 import random
 import logging
 from uuid import uuid4
-from logging.handlers import RotatingFileHandler
-from flask import Flask, request, jsonify, send_from_directory, send_file
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from flask import Flask, Response, request, jsonify, send_from_directory, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
-from hashlib import sha256
-from functools import wraps
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from werkzeug.security import generate_password_hash, check_password_hash, safe_join
+from hashlib import sha1, sha256
+from hmac import compare_digest
+from functools import wraps, lru_cache
+from itertools import accumulate
+from pymongo import MongoClient, ReturnDocument, UpdateOne, ASCENDING, DESCENDING
 from pymongo.errors import DuplicateKeyError
 import re
 import html
 import pyotp
 import qrcode
 import io
-from better_profanity import profanity
+import mimetypes
+from stat import S_ISREG
+import importlib.resources
+from gevent import get_hub
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import datetime
-from threading import Thread
+import math
+import orjson
+import queue
+import atexit
+from threading import Lock, Thread
+
+class ORJSONProvider(DefaultJSONProvider):
+    # jsonify() and request.get_json() through orjson; Flask's default() still
+    # handles dates etc.
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
 
 # Initialize Flask application
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.config.update(
     SECRET_KEY=os.environ.get("FLASK_SECRET_KEY", "1234"),
 )
@@ -40,14 +67,77 @@ handler.setFormatter(
         "%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]"
     )
 )
-app.logger.addHandler(handler)
+# Requests only enqueue records; the listener thread formats, writes and rotates
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(log_queue, handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+app.logger.addHandler(QueueHandler(log_queue))
 app.logger.setLevel(logging.INFO)
 
 # Profanity filter
-profanity.load_censor_words()
+# better_profanity's word list compiled into a single regex. Characters map to
+# the same look-alikes better_profanity accepts (e.g. "sh1t", "a$$").
+PROFANITY_CHAR_VARIANTS = {
+    "a": "a@*4",
+    "i": "i*l1",
+    "o": "o*0@",
+    "u": "u*v",
+    "v": "v*u",
+    "l": "l1",
+    "e": "e*3",
+    "s": "s$5",
+    "t": "t7",
+}
+# Characters better_profanity treats as part of a word
+PROFANITY_WORD_CHAR = r"""(?:[^\W_]|[@$*"'])"""
+
+
+def _profanity_pattern(word):
+    return "".join(
+        f"[{re.escape(PROFANITY_CHAR_VARIANTS[char])}]"
+        if char in PROFANITY_CHAR_VARIANTS
+        else re.escape(char)
+        for char in word
+    )
+
+
+def _load_profanity_re():
+    wordlist = importlib.resources.files("better_profanity") / "profanity_wordlist.txt"
+    words = {
+        word.strip().lower()
+        for word in wordlist.read_text(encoding="utf-8").splitlines()
+        if word.strip()
+    }
+    # Longest first so phrases win over their first word
+    alternatives = "|".join(
+        _profanity_pattern(word) for word in sorted(words, key=len, reverse=True)
+    )
+    return re.compile(
+        rf"(?<!{PROFANITY_WORD_CHAR})(?:{alternatives})(?!{PROFANITY_WORD_CHAR})",
+        re.IGNORECASE,
+    )
+
+
+PROFANITY_RE = _load_profanity_re()
+
+
+def censor_profanity(text, censor_char="*"):
+    return PROFANITY_RE.sub(censor_char * 4, text)
 
 # MongoDB configuration
-client = MongoClient(os.environ.get("MONGODB_URI"), maxPoolSize=50, connect=False)
+client = MongoClient(
+    os.environ.get("MONGODB_URI"),
+    maxPoolSize=int(os.environ.get("MONGODB_MAX_POOL_SIZE", 50)),
+    minPoolSize=int(os.environ.get("MONGODB_MIN_POOL_SIZE", 1)),
+    maxConnecting=8,
+    maxIdleTimeMS=60 * 1000,
+    connectTimeoutMS=3 * 1000,
+    retryWrites=True,
+    # Falls back to zlib (or none) if zstandard isn't installed
+    compressors=os.environ.get("MONGODB_COMPRESSORS", "zstd,zlib"),
+    connect=False,
+)
 db = client.get_database(os.environ.get("MONGODB_DB"))
 
 # Collections
@@ -61,7 +151,23 @@ pets_collection = db.pets
 
 # Create indexes
 users_collection.create_index([("username", ASCENDING)], unique=True)
+users_collection.create_index([("token", ASCENDING)])
+# Only banned/frozen users are indexed, so these stay tiny
+users_collection.create_index(
+    [("banned", ASCENDING), ("username", ASCENDING)],
+    partialFilterExpression={"banned": True},
+)
+users_collection.create_index(
+    [("frozen", ASCENDING), ("username", ASCENDING)],
+    partialFilterExpression={"frozen": True},
+)
+# Lets the leaderboard walk the top of the tokens index without fetching documents
+users_collection.create_index(
+    [("tokens", DESCENDING), ("username", ASCENDING), ("banned", ASCENDING)]
+)
 items_collection.create_index([("id", ASCENDING), ("owner", ASCENDING)])
+items_collection.create_index([("for_sale", ASCENDING), ("owner", ASCENDING)])
+items_collection.create_index([("item_secret", ASCENDING)])
 messages_collection.create_index([("room", ASCENDING), ("timestamp", ASCENDING)])
 rooms_collection.create_index([("name", ASCENDING)], unique=True)
 item_meta_collection.create_index([("id", ASCENDING)])
@@ -73,37 +179,113 @@ ITEM_CREATE_COOLDOWN = 1 * 60
 TOKEN_MINE_COOLDOWN = 5 * 60
 MAX_ITEM_PRICE = 1000000000000
 MIN_ITEM_PRICE = 1
+MARKET_CACHE_TTL = 5
+LEADERBOARD_CACHE_TTL = 30
+HISTORY_MAX_LENGTH = 200
+PRICE_HISTORY_MAX_LENGTH = 1000
+TOKEN_CACHE_TTL = 30
+TOKEN_CACHE_MAX_SIZE = 10000
+PASSWORD_HASH_METHOD = "scrypt"
+STATIC_CACHE_MAX_FILE_SIZE = 256 * 1024
 DISCORD_WEBHOOK = os.environ.get("DISCORD_WEBHOOK")
+DISCORD_TIMEOUT = 3
+CHAT_LIST_LIMIT = 200
+MESSAGES_PAGE_SIZE = 100
+DISCORD_MAX_EMBEDS = 10
+DISCORD_MAX_EMBED_CHARS = 6000
+DISCORD_BATCH_WINDOW = 0.5
+
+# Single-pass equivalent of html.escape(s, quote=True)
+_HTML_ESC = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"}
+)
+
+_ROOM_RE = re.compile(r"\A[A-Za-z0-9_-]{1,50}\Z")
+
+# Bound once for the chat hot path
+_now = time.time
 
 # Item generation constants
 try:
-    with open("words/adjectives.json", "r") as f:
-        ADJECTIVES = json.load(f)
-    with open("words/materials.json", "r") as f:
-        MATERIALS = json.load(f)
-    with open("words/nouns.json", "r") as f:
-        NOUNS = json.load(f)
-    with open("words/suffixes.json", "r") as f:
-        SUFFIXES = json.load(f)
-    with open("words/pet_names.json", "r") as f:
-        PET_NAMES = json.load(f)
+    with open("words/adjectives.json", "rb") as f:
+        ADJECTIVES = orjson.loads(f.read())
+    with open("words/materials.json", "rb") as f:
+        MATERIALS = orjson.loads(f.read())
+    with open("words/nouns.json", "rb") as f:
+        NOUNS = orjson.loads(f.read())
+    with open("words/suffixes.json", "rb") as f:
+        SUFFIXES = orjson.loads(f.read())
+    with open("words/pet_names.json", "rb") as f:
+        PET_NAMES = orjson.loads(f.read())
     app.logger.info("Loaded item generation word lists successfully")
 except Exception as e:
     app.logger.critical(f"Failed to load word lists: {str(e)}")
     raise
 
 
+def _choice_table(choices, weights):
+    return tuple(choices), tuple(accumulate(weights))
+
+
+# (choices, cumulative weights) for random.choices, built once
+ADJECTIVE_TABLE = _choice_table(ADJECTIVES, ADJECTIVES.values())
+MATERIAL_TABLE = _choice_table(MATERIALS, MATERIALS.values())
+SUFFIX_TABLE = _choice_table(SUFFIXES, SUFFIXES.values())
+NOUN_TABLE = _choice_table(NOUNS, (1 / noun["rarity"] for noun in NOUNS.values()))
+
+
 # Utility functions
 def split_name(name):
+    parts = name.split(" ")
+    suffix, _, number = " ".join(parts[3:]).partition("#")
     return {
-        "adjective": name.split(" ")[0],
-        "material": name.split(" ")[1],
-        "noun": name.split(" ")[2],
-        "suffix": " ".join(name.split(" ")[3:]).split("#")[0],
-        "number": " ".join(name.split(" ")[3:]).split("#")[1],
+        "adjective": parts[0],
+        "material": parts[1],
+        "noun": parts[2],
+        "suffix": suffix,
+        "number": number,
     }
 
 
+def _to_float(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _meta_id(adjective, material, noun, suffix):
+    return sha256(f"{adjective}{material}{noun}{suffix}".encode()).hexdigest()
+
+
+def get_meta_id(name):
+    return _meta_id(name["adjective"], name["material"], name["noun"], name["suffix"])
+
+
+def format_item_name(name):
+    suffix = name["suffix"]
+    suffix = f" {suffix}" if suffix.strip() else ""
+    return (
+        f"{name['adjective']} {name['material']} {name['noun']}{suffix} "
+        f"#{name['number']}"
+    )
+
+
+def item_display_name(item):
+    return item.get("display_name") or format_item_name(item["name"])
+
+
+# Only a few distinct rarity values ever occur, so the cache stays small
+@lru_cache(maxsize=1024)
 def get_level(rarity):
     if rarity <= 0.1:
         return "Godlike"
@@ -123,72 +305,180 @@ def get_level(rarity):
         return "Trash"
 
 
+DURATION_UNITS = {
+    "s": 1,
+    "m": 60,
+    "h": 60 * 60,
+    "d": 60 * 60 * 24,
+    "w": 60 * 60 * 24 * 7,
+    "y": 60 * 60 * 24 * 365,
+}
+
+
+def parse_duration(length):
+    duration = 0
+    for part in length.split("+"):
+        unit = DURATION_UNITS.get(part[-1].lower())
+        if unit:
+            duration += unit * int(part[:-1])
+    return duration
+
+
 def parse_time(length):
-    now = time.time()
     if not length or length.lower() == "perma":
         # Forever
-        end_time = 0
-    else:
-        # Parse duration
-        parts = length.split("+")
-        duration = 0
-        for part in parts:
-            if part[-1].lower() == "s":
-                duration += int(part[:-1])
-            elif part[-1].lower() == "m":
-                duration += 60 * int(part[:-1])
-            elif part[-1].lower() == "h":
-                duration += 60 * 60 * int(part[:-1])
-            elif part[-1].lower() == "d":
-                duration += 60 * 60 * 24 * int(part[:-1])
-            elif part[-1].lower() == "w":
-                duration += 60 * 60 * 24 * 7 * int(part[:-1])
-            elif part[-1].lower() == "y":
-                duration += 60 * 60 * 24 * 365 * int(part[:-1])
-
-        end_time = now + duration
-
-    return end_time
-
-
-def _send_discord_notification(title, description, color=0x00FF00):
+        return 0
+    return _now() + parse_duration(length)
+
+
+# Kept-alive connection to Discord, shared by the notification worker
+discord_session = requests.Session()
+discord_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=4,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+        ),
+    ),
+)
+
+
+def _send_discord_embeds(embeds):
     webhook_url = DISCORD_WEBHOOK
     if not webhook_url:
         app.logger.error("Discord webhook URL not configured.")
         return
 
-    data = {"embeds": [{"title": title, "description": description, "color": color}]}
-
-    response = requests.post(webhook_url, json=data)
+    response = discord_session.post(
+        webhook_url,
+        data=orjson.dumps({"embeds": embeds}),
+        headers={"Content-Type": "application/json"},
+        timeout=DISCORD_TIMEOUT,
+    )
     if response.status_code == 204:
-        app.logger.info("Notification sent to Discord successfully.")
+        app.logger.info(f"Sent {len(embeds)} notification(s) to Discord.")
     else:
         app.logger.error(
             f"Failed to send notification to Discord: {response.status_code} {response.text}"
         )
-        
+
+
+def _embed_size(embed):
+    return len(embed["title"]) + len(embed["description"])
+
+
+# Notifications are posted by a single background worker so requests never
+# wait on Discord. Bursts are coalesced into one webhook call of up to
+# DISCORD_MAX_EMBEDS embeds.
+_notification_queue = queue.Queue()
+_notification_worker = None
+_notification_worker_lock = Lock()
+
+
+def _notification_worker_loop():
+    pending = None
+    while True:
+        embed = pending if pending is not None else _notification_queue.get()
+        pending = None
+        embeds = [embed]
+        size = _embed_size(embed)
+        deadline = time.monotonic() + DISCORD_BATCH_WINDOW
+        while len(embeds) < DISCORD_MAX_EMBEDS:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                embed = _notification_queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if size + _embed_size(embed) > DISCORD_MAX_EMBED_CHARS:
+                # Discord rejects the whole message if it's too long
+                pending = embed
+                break
+            embeds.append(embed)
+            size += _embed_size(embed)
+
+        try:
+            _send_discord_embeds(embeds)
+        except Exception as e:
+            app.logger.error(f"Failed to send notification to Discord: {str(e)}")
+        finally:
+            for _ in embeds:
+                _notification_queue.task_done()
+
+
 def send_discord_notification(title, description, color=0x00FF00):
-    Thread(target=_send_discord_notification, args=(title, description, color)).start()
+    global _notification_worker
+    # Started lazily so each forked worker process gets its own thread
+    if _notification_worker is None:
+        with _notification_worker_lock:
+            if _notification_worker is None:
+                _notification_worker = Thread(
+                    target=_notification_worker_loop, daemon=True
+                )
+                _notification_worker.start()
+    _notification_queue.put(
+        {"title": title, "description": description, "color": color}
+    )
+
+
+# Authenticated user cache: token -> (expires_at, user)
+_token_cache = {}
+# username -> token, so account changes can evict the cached entry
+_token_cache_users = {}
+
+
+def get_user_by_token(token):
+    now = time.time()
+    cached = _token_cache.get(token)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    user = users_collection.find_one(
+        {"token": token},
+        {"_id": 0, "username": 1, "type": 1, "banned_until": 1, "muted_until": 1},
+    )
+    if user:
+        if len(_token_cache) >= TOKEN_CACHE_MAX_SIZE:
+            _token_cache.clear()
+            _token_cache_users.clear()
+        _token_cache[token] = (now + TOKEN_CACHE_TTL, user)
+        _token_cache_users[user["username"]] = token
+    return user
+
+
+def invalidate_token_cache(username):
+    token = _token_cache_users.pop(username, None)
+    if token:
+        _token_cache.pop(token, None)
+
+
+# Endpoints reachable without a token
+PUBLIC_ENDPOINTS = frozenset(
+    {
+        "register_endpoint",
+        "login_endpoint",
+        "index",
+        "static_file",
+        "stats_endpoint",
+    }
+)
+BEARER_PREFIX = "Bearer "
 
 
 # Authentication middleware
 @app.before_request
 def authenticate_user():
-    if (
-        request.method == "OPTIONS"
-        or request.endpoint
-        in [
-            "register_endpoint",
-            "login_endpoint",
-            "index",
-            "static_file",
-            "stats_endpoint",
-        ]
-    ):
+    if request.method == "OPTIONS" or request.endpoint in PUBLIC_ENDPOINTS:
         return
 
     auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
+    if not auth_header or not auth_header.startswith(BEARER_PREFIX):
         app.logger.warning("Missing or invalid Authorization header")
         return (
             jsonify(
@@ -200,11 +490,12 @@ def authenticate_user():
             401,
         )
 
-    token = auth_header.split(" ")[1]
-    user = users_collection.find_one({"token": token})
+    token = auth_header[len(BEARER_PREFIX) :]
+    user = get_user_by_token(token)
     if user:
         request.username = user["username"]
         request.user_type = user.get("type", "user")
+        request.user = user
         return
 
     app.logger.warning("Invalid token provided")
@@ -212,58 +503,82 @@ def authenticate_user():
 
 
 # Database updaters
-def update_item(item_id):
-    item = items_collection.find_one({"id": item_id})
-    if not item:
+def new_item_meta(meta_id, name):
+    rarity = round(random.uniform(0.1, 100), 1)
+    return {
+        "id": meta_id,
+        "adjective": name["adjective"],
+        "material": name["material"],
+        "noun": name["noun"],
+        "suffix": name["suffix"],
+        "rarity": rarity,
+        "level": get_level(rarity),
+        "patented": False,
+        "patent_owner": None,
+        "price_history": [],
+    }
+
+
+def update_items(item_ids):
+    items = list(
+        items_collection.find(
+            {"id": {"$in": item_ids}}, {"_id": 0, "id": 1, "name": 1, "meta_id": 1}
+        )
+    )
+    if not items:
         return
 
-    name = item["name"]
-
-    meta_id = None
-
-    if "meta_id" not in item:
-        meta_id = sha256(
-            f"{name['adjective']}{name['material']}{name['noun']}{name['suffix']}".encode()
-        ).hexdigest()
-
-        meta = item_meta_collection.find_one({"id": meta_id})
-        if not meta:
-            rarity = round(random.uniform(0.1, 100), 1)
-
-            meta = {
-                "id": meta_id,
-                "adjective": name["adjective"],
-                "material": name["material"],
-                "noun": name["noun"],
-                "suffix": name["suffix"],
-                "rarity": rarity,
-                "level": get_level(rarity),
-                "patented": False,
-                "patent_owner": None,
-                "price_history": [],
-            }
-            item_meta_collection.insert_one(meta)
-    else:
-        meta_id = item["meta_id"]
-        meta = item_meta_collection.find_one({"id": meta_id})
+    names = {}
+    for item in items:
+        if "meta_id" not in item:
+            name = item["name"]
+            item["meta_id"] = get_meta_id(name)
+            names[item["meta_id"]] = name
+
+    metas = {
+        meta["id"]: meta
+        for meta in item_meta_collection.find(
+            {"id": {"$in": list({item["meta_id"] for item in items})}},
+            {"_id": 0, "id": 1, "rarity": 1, "level": 1},
+        )
+    }
 
-    if "history" not in item:
-        items_collection.update_one({"id": item_id}, {"$set": {"history": []}})
-        items_collection.update_one(
-            {"id": item_id}, {"$set": {"rarity": round(item["rarity"], 1)}}
+    missing = [
+        new_item_meta(meta_id, name)
+        for meta_id, name in names.items()
+        if meta_id not in metas
+    ]
+    if missing:
+        item_meta_collection.insert_many(missing, ordered=False)
+        metas.update((meta["id"], meta) for meta in missing)
+
+    operations = [
+        UpdateOne(
+            {"id": item["id"]},
+            [
+                {
+                    "$set": {
+                        "history": {"$ifNull": ["$history", []]},
+                        "display_name": {
+                            "$ifNull": [
+                                "$display_name",
+                                {"$literal": format_item_name(item["name"])},
+                            ]
+                        },
+                        "meta_id": item["meta_id"],
+                        "rarity": metas[item["meta_id"]]["rarity"],
+                        "level": metas[item["meta_id"]]["level"],
+                    }
+                }
+            ],
         )
+        for item in items
+        if item["meta_id"] in metas
+    ]
+    if operations:
+        items_collection.bulk_write(operations, ordered=False)
+
 
-    items_collection.update_one(
-        {"id": item_id},
-        {
-            "$set": {
-                "meta_id": meta_id,
-                "rarity": meta["rarity"],
-                "level": meta["level"],
-            }
-        },
-    )
-    
 def update_pet(pet_id):
     pet = pets_collection.find_one({"id": pet_id})
         
@@ -287,83 +602,74 @@ def update_pet(pet_id):
         pets_collection.update_one({"id": pet_id}, {"$set": {"health": "starving"}})
 
 
-def update_account(username):
-    user = users_collection.find_one({"username": username})
-    if not user:
-        return jsonify({"error": "User not found", "code": "user-not-found"}), 404
-
-    if (
-        "banned_until" not in user
-        or "banned_reason" not in user
-        or "banned" not in user
-    ):
-        users_collection.update_one(
-            {"username": username},
-            {"$set": {"banned_until": None, "banned_reason": None, "banned": False}},
-        )
-
-    if "history" not in user:
-        users_collection.update_one({"username": username}, {"$set": {"history": []}})
-
-    if "exp" not in user or "level" not in user:
-        users_collection.update_one(
-            {"username": username},
-            {"$set": {"exp": 0, "level": 1}},
-        )
-
-    if "frozen" not in user:
-        users_collection.update_one({"username": username}, {"$set": {"frozen": False}})
+# Defaults for fields added after an account was created
+ACCOUNT_DEFAULTS = {
+    "banned_until": None,
+    "banned_reason": None,
+    "banned": False,
+    "history": [],
+    "exp": 0,
+    "level": 1,
+    "frozen": False,
+    "muted": False,
+    "muted_until": None,
+    "inventory_visibility": "private",
+    "2fa_enabled": False,
+    "pets": [],
+}
+
+
+def _expired(field, now):
+    # Matches a non-zero timestamp in the past; 0 means forever
+    return {
+        "$and": [
+            {"$ne": [{"$ifNull": [f"${field}", 0]}, 0]},
+            {"$lt": [f"${field}", now]},
+        ]
+    }
 
-    if "muted" not in user or "muted_until" not in user:
-        users_collection.update_one(
-            {"username": username},
-            {"$set": {"muted": False, "muted_until": None}},
-        )
 
-    if "inventory_visibility" not in user:
-        users_collection.update_one(
-            {"username": username},
-            {"$set": {"inventory_visibility": "private"}},
-        )
-
-    if "2fa_enabled" not in user:
-        users_collection.update_one(
-            {"username": username}, {"$set": {"2fa_enabled": False}}
-        )
-        
-    if "pets" not in user:
-        users_collection.update_one(
-            {"username": username}, {"$set": {"pets": []}}
-        )
+def update_account(username):
+    now = time.time()
+    ban_expired = _expired("banned_until", now)
+    mute_expired = _expired("muted_until", now)
 
-    if user.get("banned_until", None) and (
-        user["banned_until"] < time.time() and user["banned_until"] != 0
-    ):
-        users_collection.update_one(
-            {"username": username},
-            {"$set": {"banned_until": None, "banned_reason": None}},
-        )
+    user = users_collection.find_one_and_update(
+        {"username": username},
+        [
+            {
+                "$set": {
+                    field: {"$ifNull": [f"${field}", {"$literal": default}]}
+                    for field, default in ACCOUNT_DEFAULTS.items()
+                }
+            },
+            {
+                "$set": {
+                    "banned_until": {"$cond": [ban_expired, None, "$banned_until"]},
+                    "banned_reason": {"$cond": [ban_expired, None, "$banned_reason"]},
+                    "muted": {"$cond": [mute_expired, False, "$muted"]},
+                    "muted_until": {"$cond": [mute_expired, None, "$muted_until"]},
+                }
+            },
+        ],
+        return_document=ReturnDocument.AFTER,
+    )
+    if not user:
+        return None
 
-    if user.get("muted_until", None) and (
-        user["muted_until"] < time.time() and user["muted_until"] != 0
-    ):
-        users_collection.update_one(
-            {"username": username},
-            {"$set": {"muted": False, "muted_until": None}},
-        )
+    update_items(user["items"])
 
-    for item_id in user["items"]:
-        update_item(item_id)
-        
     for pet_id in user["pets"]:
         update_pet(pet_id)
 
+    return user
+
 
 # Admin requirement decorator
 def requires_admin(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        user = users_collection.find_one({"username": request.username})
+        user = request.user
         if user.get("type") != "admin":
             app.logger.warning(
                 f"Admin privileges required for user: {request.username}"
@@ -383,7 +689,7 @@ def requires_admin(f):
 def requires_mod(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        user = users_collection.find_one({"username": request.username})
+        user = request.user
         if user.get("type") not in ["admin", "mod"]:
             app.logger.warning(f"Mod privileges required for user: {request.username}")
             return (
@@ -399,7 +705,7 @@ def requires_mod(f):
 def requires_unbanned(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        user = users_collection.find_one({"username": request.username})
+        user = request.user
         if user.get("banned_until", None):
             app.logger.warning(f"User is banned: {request.username}")
             return jsonify({"error": "You are banned", "code": "banned"}), 403
@@ -409,56 +715,38 @@ def requires_unbanned(f):
 
 
 # Item generation function
-def generate_item(owner):
-    def weighted_choice(items, special_case=False):
-        choices, weights = zip(*items.items())
-        if special_case:
-            choices = list(items.keys())
-            weights = []
-            for choice in choices:
-                weights.append(1 / items[choice]["rarity"])
-        return random.choices(choices, weights=weights, k=1)[0]
-
-    noun = weighted_choice(NOUNS, special_case=True)
+def weighted_choice(table):
+    choices, cum_weights = table
+    return random.choices(choices, cum_weights=cum_weights)[0]
+
+
+def generate_item(owner, item_id=None):
+    noun = weighted_choice(NOUN_TABLE)
 
     name = {
-        "adjective": weighted_choice(ADJECTIVES),
-        "material": weighted_choice(MATERIALS),
+        "adjective": weighted_choice(ADJECTIVE_TABLE),
+        "material": weighted_choice(MATERIAL_TABLE),
         "noun": noun,
-        "suffix": weighted_choice(SUFFIXES),
+        "suffix": weighted_choice(SUFFIX_TABLE),
         "number": random.randint(1, 9999),
         "icon": NOUNS[noun]["icon"],
     }
 
-    meta_id = sha256(
-        f"{name['adjective']}{name['material']}{name['noun']}{name['suffix']}".encode()
-    ).hexdigest()
+    meta_id = get_meta_id(name)
 
     meta = item_meta_collection.find_one({"id": meta_id})
     if not meta:
-        rarity = round(random.uniform(0.1, 100), 1)
-
-        meta = {
-            "id": meta_id,
-            "adjective": name["adjective"],
-            "material": name["material"],
-            "noun": name["noun"],
-            "suffix": name["suffix"],
-            "rarity": rarity,
-            "level": get_level(rarity),
-            "patented": False,
-            "patent_owner": None,
-            "price_history": [],
-        }
+        meta = new_item_meta(meta_id, name)
         item_meta_collection.insert_one(meta)
 
     return {
-        "id": str(uuid4()),
+        "id": item_id or str(uuid4()),
         "meta_id": meta_id,
         "item_secret": str(uuid4()),
         "rarity": meta["rarity"],
         "level": meta["level"],
         "name": name,
+        "display_name": format_item_name(name),
         "history": [],
         "for_sale": False,
         "price": 0,
@@ -478,48 +766,84 @@ def generate_pet(owner):
     }
 
 
+# Password hashing
+# Key derivation is CPU-bound and releases the GIL, so run it on gevent's
+# native thread pool instead of stalling every greenlet in the worker
+def hash_password(password):
+    # Pinned so older Werkzeug releases don't fall back to slower pbkdf2
+    return get_hub().threadpool.apply(
+        generate_password_hash, (password, PASSWORD_HASH_METHOD)
+    )
+
+
+def verify_password(password_hash, password):
+    return get_hub().threadpool.apply(check_password_hash, (password_hash, password))
+
+
 # EXP Functions
 def exp_for_level(level):
     return int(25 * (1.2 ** (level - 1)))
 
 
-def add_exp(username, exp):
-    user = users_collection.find_one({"username": username})
-    if not user:
-        return
+# Server-side equivalent of "if exp >= exp_for_level(level + 1): level += 1"
+LEVEL_UP_STAGE = {
+    "$set": {
+        "level": {
+            "$cond": [
+                {
+                    "$gte": [
+                        "$exp",
+                        {"$trunc": {"$multiply": [25, {"$pow": [1.2, "$level"]}]}},
+                    ]
+                },
+                {"$add": ["$level", 1]},
+                "$level",
+            ]
+        }
+    }
+}
 
-    next_level = user["level"] + 1
 
-    users_collection.update_one({"username": username}, {"$inc": {"exp": exp}})
+def push_expr(field, value, limit=None):
+    # $push (with an optional trailing $slice) for update pipelines
+    expr = {"$concatArrays": [{"$ifNull": [f"${field}", []]}, [{"$literal": value}]]}
+    if limit:
+        expr = {"$slice": [expr, -limit]}
+    return expr
 
-    if user["exp"] >= exp_for_level(next_level):
-        users_collection.update_one(
-            {"username": username}, {"$set": {"level": next_level}}
-        )
 
+def pull_expr(field, value):
+    # $pull for update pipelines
+    return {
+        "$filter": {
+            "input": {"$ifNull": [f"${field}", []]},
+            "cond": {"$ne": ["$$this", {"$literal": value}]},
+        }
+    }
 
-def set_exp(username, exp):
-    user = users_collection.find_one({"username": username})
-    if not user:
-        return
 
-    next_level = user["level"] + 1
+def history_entry(entry):
+    # $push modifier that keeps only the most recent history entries
+    return {"$each": [entry], "$slice": -HISTORY_MAX_LENGTH}
 
-    users_collection.update_one({"username": username}, {"$set": {"exp": exp}})
 
-    if user["exp"] >= exp_for_level(next_level):
-        users_collection.update_one(
-            {"username": username}, {"$set": {"level": next_level}}
-        )
+def add_exp(username, exp):
+    users_collection.update_one(
+        {"username": username},
+        [{"$set": {"exp": {"$add": ["$exp", exp]}}}, LEVEL_UP_STAGE],
+    )
 
 
-def set_level(username, level):
-    user = users_collection.find_one({"username": username})
-    if not user:
-        return
+def set_exp(username, exp):
+    return users_collection.update_one(
+        {"username": username},
+        [{"$set": {"exp": {"$literal": exp}}}, LEVEL_UP_STAGE],
+    )
+
 
+def set_level(username, level):
     level_exp = exp_for_level(level)
-    users_collection.update_one(
+    return users_collection.update_one(
         {"username": username}, {"$set": {"level": level, "exp": level_exp}}
     )
 
@@ -534,21 +858,19 @@ def get_user(username):
 
 
 def get_users():
-    users = users_collection.find({}, {"_id": 0, "username": 1})
-    usernames = [user["username"] for user in users]
-    return jsonify({"usernames": usernames})
+    return jsonify({"usernames": users_collection.distinct("username")})
 
 
 def get_banned_users():
-    users = users_collection.find({"banned": True}, {"_id": 0, "username": 1})
-    usernames = [user["username"] for user in users]
-    return jsonify({"usernames": usernames})
+    return jsonify(
+        {"usernames": users_collection.distinct("username", {"banned": True})}
+    )
 
 
 def get_muted_users():
-    users = users_collection.find({"muted": True}, {"_id": 0, "username": 1})
-    usernames = [user["username"] for user in users]
-    return jsonify({"usernames": usernames})
+    return jsonify(
+        {"usernames": users_collection.distinct("username", {"muted": True})}
+    )
 
 
 def register(username, password):
@@ -562,7 +884,7 @@ def register(username, password):
 
     # Sanitize and validate username
     validateUsername = username.strip()
-    validateUsername = profanity.censor(validateUsername, censor_char="-")
+    validateUsername = censor_profanity(validateUsername, censor_char="-")
     if not re.match(r"^[a-zA-Z0-9_-]{3,20}$", validateUsername):
         return (
             jsonify(
@@ -574,7 +896,7 @@ def register(username, password):
         )
 
     try:
-        hashed_password = generate_password_hash(password)
+        hashed_password = hash_password(password)
         users_collection.insert_one(
             {
                 "created_at": int(time.time()),
@@ -612,8 +934,17 @@ def register(username, password):
 
 
 def login(username, password, code=None, token=None):
-    user = users_collection.find_one({"username": username})
-    if not user or not check_password_hash(user["password_hash"], password):
+    user = users_collection.find_one(
+        {"username": username},
+        {
+            "_id": 0,
+            "password_hash": 1,
+            "2fa_enabled": 1,
+            "2fa_code": 1,
+            "2fa_secret": 1,
+        },
+    )
+    if not user or not verify_password(user["password_hash"], password):
         return (
             jsonify(
                 {"error": "Invalid username or password", "code": "invalid-credentials"}
@@ -634,7 +965,12 @@ def login(username, password, code=None, token=None):
             )
 
         if code:
-            if not user["2fa_code"] == code:
+            backup_code = user.get("2fa_code")
+            if (
+                not backup_code
+                or not isinstance(code, str)
+                or not compare_digest(backup_code.encode(), code.encode())
+            ):
                 return (
                     jsonify(
                         {"error": "Invalid 2FA backup code", "code": "invalid-2fa-code"}
@@ -642,8 +978,7 @@ def login(username, password, code=None, token=None):
                     401,
                 )
         else:
-            user = users_collection.find_one({"username": username})
-            totp = pyotp.TOTP(user["2fa_secret"])
+            totp = get_totp(user["2fa_secret"])
             if not totp.verify(token):
                 return (
                     jsonify(
@@ -654,45 +989,59 @@ def login(username, password, code=None, token=None):
 
     token = str(uuid4())
     users_collection.update_one({"username": username}, {"$set": {"token": token}})
+    invalidate_token_cache(username)
     send_discord_notification(f"User logged in", f"Username: {username}")
     return jsonify({"success": True, "token": token})
 
 
 def delete_account(username):
-    user = users_collection.find_one({"username": username})
-    if not user:
+    # Delete the user; a miss doubles as the existence check
+    if not users_collection.delete_one({"username": username}).deleted_count:
         return jsonify({"error": "User not found", "code": "user-not-found"}), 404
+    invalidate_token_cache(username)
 
     # Delete user's items
     items_collection.delete_many({"owner": username})
-
-    # Delete the user
-    users_collection.delete_one({"username": username})
+    invalidate_market_cache()
 
     send_discord_notification(f"User deleted", f"Username: {username}")
 
     return jsonify({"success": True})
 
 
+@lru_cache(maxsize=4096)
+def get_totp(secret):
+    return pyotp.TOTP(secret)
+
+
+@lru_cache(maxsize=256)
+def render_qrcode_png(data):
+    img = qrcode.make(data)
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
 def setup_2fa(username):
-    user = users_collection.find_one({"username": username})
+    user = users_collection.find_one(
+        {"username": username},
+        {"_id": 0, "2fa_enabled": 1, "2fa_secret": 1, "2fa_code": 1},
+    )
     if user.get("2fa_enabled", False):
         return (
             jsonify({"error": "2FA is already enabled", "code": "2fa-already-enabled"}),
             400,
         )
+    # Fill in whatever is missing in one write instead of re-reading the user
+    missing = {}
     if "2fa_secret" not in user:
-        secret = pyotp.random_base32(32)
-        users_collection.update_one(
-            {"username": username}, {"$set": {"2fa_secret": secret}}
-        )
+        missing["2fa_secret"] = pyotp.random_base32(32)
     if "2fa_code" not in user:
-        code = str(uuid4())
-        users_collection.update_one(
-            {"username": username}, {"$set": {"2fa_code": code}}
-        )
-    user = users_collection.find_one({"username": username})
-    totp = pyotp.TOTP(user["2fa_secret"])
+        missing["2fa_code"] = str(uuid4())
+    if missing:
+        users_collection.update_one({"username": username}, {"$set": missing})
+        user.update(missing)
+    totp = get_totp(user["2fa_secret"])
     provisioning_uri = totp.provisioning_uri(
         name=request.username,
         issuer_name="Economix",
@@ -706,7 +1055,9 @@ def setup_2fa(username):
 
 
 def get_2fa_qrcode(username):
-    user = users_collection.find_one({"username": username})
+    user = users_collection.find_one(
+        {"username": username}, {"_id": 0, "2fa_secret": 1}
+    )
     if "2fa_secret" not in user:
         return (
             jsonify(
@@ -714,21 +1065,20 @@ def get_2fa_qrcode(username):
             ),
             400,
         )
-    totp = pyotp.TOTP(user["2fa_secret"])
+    totp = get_totp(user["2fa_secret"])
     provisioning_uri = totp.provisioning_uri(
         name=username,
         issuer_name="Economix",
         image="https://economix.proplayer919.dev/brand/logo.png",
     )
-    img = qrcode.make(provisioning_uri)
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0)
-    return send_file(buf, mimetype="image/png")
+    png = render_qrcode_png(provisioning_uri)
+    return send_file(io.BytesIO(png), mimetype="image/png")
 
 
 def verify_2fa(username, token):
-    user = users_collection.find_one({"username": username})
+    user = users_collection.find_one(
+        {"username": username}, {"_id": 0, "2fa_secret": 1}
+    )
     if "2fa_secret" not in user:
         return (
             jsonify(
@@ -736,7 +1086,7 @@ def verify_2fa(username, token):
             ),
             400,
         )
-    totp = pyotp.TOTP(user["2fa_secret"])
+    totp = get_totp(user["2fa_secret"])
     if not totp.verify(token):
         return jsonify({"error": "Invalid 2FA token", "code": "invalid-2fa-token"}), 401
     users_collection.update_one({"username": username}, {"$set": {"2fa_enabled": True}})
@@ -754,64 +1104,72 @@ def disable_2fa(username):
 
 def create_item(username):
     now = time.time()
+    item_id = str(uuid4())
 
-    user = users_collection.find_one({"username": username}, {"_id": 0})
-    if not user:
-        return jsonify({"error": "User not found", "code": "user-not-found"}), 404
-
-    if now - user["last_item_time"] < ITEM_CREATE_COOLDOWN:
-        remaining = ITEM_CREATE_COOLDOWN - (now - user["last_item_time"])
-        return (
-            jsonify(
-                {
-                    "error": "Cooldown active",
-                    "remaining": remaining,
-                    "code": "cooldown-active",
-                }
-            ),
-            429,
-        )
-
-    if user["tokens"] < 10:
-        return jsonify({"error": "Not enough tokens", "code": "not-enough-tokens"}), 402
-
-    new_item = generate_item(username)
-    items_collection.insert_one(new_item)
-    users_collection.update_one(
-        {"username": username},
+    # Cooldown and token checks are part of the filter so the claim is atomic;
+    # the pre-claim document is returned so the charge can be refunded
+    previous = users_collection.find_one_and_update(
         {
-            "$push": {"items": new_item["id"]},
-            "$set": {"last_item_time": now},
-            "$inc": {"tokens": -10},
+            "username": username,
+            "last_item_time": {"$lte": now - ITEM_CREATE_COOLDOWN},
+            "tokens": {"$gte": 10},
         },
-    )
-
-    users_collection.update_one(
-        {"username": username},
-        {
-            "$push": {
-                "history": {
-                    "item_id": new_item["id"],
-                    "action": "create",
-                    "timestamp": now,
+        [
+            {
+                "$set": {
+                    "items": push_expr("items", item_id),
+                    "history": push_expr(
+                        "history",
+                        {"item_id": item_id, "action": "create", "timestamp": now},
+                        HISTORY_MAX_LENGTH,
+                    ),
+                    "last_item_time": now,
+                    "tokens": {"$add": ["$tokens", -10]},
+                    "exp": {"$add": ["$exp", 10]},
                 }
-            }
-        },
+            },
+            LEVEL_UP_STAGE,
+        ],
+        projection={"_id": 0, "last_item_time": 1},
     )
+    if not previous:
+        user = users_collection.find_one(
+            {"username": username}, {"_id": 0, "last_item_time": 1, "tokens": 1}
+        )
+        if not user:
+            return jsonify({"error": "User not found", "code": "user-not-found"}), 404
 
-    add_exp(username, 10)
+        if now - user["last_item_time"] < ITEM_CREATE_COOLDOWN:
+            remaining = ITEM_CREATE_COOLDOWN - (now - user["last_item_time"])
+            return (
+                jsonify(
+                    {
+                        "error": "Cooldown active",
+                        "remaining": remaining,
+                        "code": "cooldown-active",
+                    }
+                ),
+                429,
+            )
 
-    item = new_item
-    name_parts = [
-        item["name"]["adjective"],
-        item["name"]["material"],
-        item["name"]["noun"],
-    ]
-    suffix = item["name"]["suffix"]
-    if suffix.strip():
-        name_parts.append(suffix)
-    name_parts.append(f"#{item['name']['number']}")
-    item_name = " ".join(name_parts)
+        return jsonify({"error": "Not enough tokens", "code": "not-enough-tokens"}), 402
+
+    try:
+        new_item = generate_item(username, item_id)
+        items_collection.insert_one(new_item)
+    except Exception:
+        # Release the claim
+        users_collection.update_one(
+            {"username": username},
+            {
+                "$inc": {"tokens": 10, "exp": -10},
+                "$pull": {"items": item_id, "history": {"item_id": item_id}},
+                "$set": {"last_item_time": previous["last_item_time"]},
+            },
+        )
+        raise
+
+    item_name = new_item["display_name"]
 
     send_discord_notification(
         title="New Item Created",
@@ -824,7 +1182,7 @@ def create_item(username):
     )
     
 def buy_pet(username):
-    user = users_collection.find_one({"username": username}, {"_id": 0})
+    user = users_collection.find_one({"username": username}, {"_id": 0, "tokens": 1})
     if not user:
         return jsonify({"error": "User not found", "code": "user-not-found"}), 404
 
@@ -847,7 +1205,7 @@ def buy_pet(username):
     return jsonify(pet)
   
 def feed_pet(username, pet_id):
-    user = users_collection.find_one({"username": username}, {"_id": 0})
+    user = users_collection.find_one({"username": username}, {"_id": 0, "tokens": 1})
     if not user:
         return jsonify({"error": "User not found", "code": "user-not-found"}), 404
 
@@ -873,11 +1231,32 @@ def feed_pet(username, pet_id):
 def mine_tokens(username):
     now = time.time()
 
-    user = users_collection.find_one({"username": username}, {"_id": 0})
-    if not user:
-        return jsonify({"error": "User not found", "code": "user-not-found"}), 404
+    mined_tokens = random.randint(5, 10)
+    result = users_collection.update_one(
+        {"username": username, "last_mine_time": {"$lte": now - TOKEN_MINE_COOLDOWN}},
+        [
+            {
+                "$set": {
+                    "history": push_expr(
+                        "history",
+                        {"item_id": None, "action": "mine", "timestamp": now},
+                        HISTORY_MAX_LENGTH,
+                    ),
+                    "last_mine_time": now,
+                    "tokens": {"$add": ["$tokens", mined_tokens]},
+                    "exp": {"$add": ["$exp", 5]},
+                }
+            },
+            LEVEL_UP_STAGE,
+        ],
+    )
+    if not result.matched_count:
+        user = users_collection.find_one(
+            {"username": username}, {"_id": 0, "last_mine_time": 1}
+        )
+        if not user:
+            return jsonify({"error": "User not found", "code": "user-not-found"}), 404
 
-    if now - user["last_mine_time"] < TOKEN_MINE_COOLDOWN:
         remaining = TOKEN_MINE_COOLDOWN - (now - user["last_mine_time"])
         return (
             jsonify(
@@ -890,19 +1269,6 @@ def mine_tokens(username):
             429,
         )
 
-    mined_tokens = random.randint(5, 10)
-    users_collection.update_one(
-        {"username": username},
-        {"$inc": {"tokens": mined_tokens}, "$set": {"last_mine_time": now}},
-    )
-
-    users_collection.update_one(
-        {"username": username},
-        {"$push": {"history": {"item_id": None, "action": "mine", "timestamp": now}}},
-    )
-
-    add_exp(username, 5)
-
     send_discord_notification(
         title="Tokens Mined",
         description=f"User {username} mined {mined_tokens} tokens",
@@ -912,19 +1278,35 @@ def mine_tokens(username):
     return jsonify({"success": True, "tokens": mined_tokens})
 
 
+# Market listing cache: (expires_at, items)
+_market_cache = (0, None)
+
+
+def invalidate_market_cache():
+    global _market_cache
+    _market_cache = (0, None)
+
+
+def get_market_items():
+    global _market_cache
+    now = time.time()
+    expires_at, items = _market_cache
+    if items is None or expires_at <= now:
+        items = list(
+            items_collection.find({"for_sale": True}, {"_id": 0, "item_secret": 0})
+        )
+        _market_cache = (now + MARKET_CACHE_TTL, items)
+    return items
+
+
 def get_market(username):
-    items = items_collection.find(
-        {"for_sale": True, "owner": {"$ne": username}}, {"_id": 0, "item_secret": 0}
-    )
-    return jsonify(list(items))
+    items = [item for item in get_market_items() if item["owner"] != username]
+    return jsonify(items)
 
 
 def sell_item(username, item_id, price):
-    try:
-        price = float(price)
-        if not MIN_ITEM_PRICE <= price <= MAX_ITEM_PRICE:
-            raise ValueError
-    except ValueError:
+    price = _to_float(price)
+    if price is None or not MIN_ITEM_PRICE <= price <= MAX_ITEM_PRICE:
         return (
             jsonify(
                 {"error": f"Invalid price (must be {MIN_ITEM_PRICE}-{MAX_ITEM_PRICE})"}
@@ -941,31 +1323,20 @@ def sell_item(username, item_id, price):
         "price": price if not item["for_sale"] else 0,
     }
     items_collection.update_one({"id": item_id}, {"$set": update_data})
+    invalidate_market_cache()
 
     users_collection.update_one(
         {"username": username},
         {
             "$push": {
-                "history": {
-                    "item_id": item_id,
-                    "action": "sell",
-                    "timestamp": time.time(),
-                }
+                "history": history_entry(
+                    {"item_id": item_id, "action": "sell", "timestamp": time.time()}
+                )
             }
         },
     )
 
-    # Construct item name
-    name_parts = [
-        item["name"]["adjective"],
-        item["name"]["material"],
-        item["name"]["noun"],
-    ]
-    suffix = item["name"]["suffix"]
-    if suffix.strip():
-        name_parts.append(suffix)
-    name_parts.append(f"#{item['name']['number']}")
-    item_name = " ".join(name_parts)
+    item_name = item_display_name(item)
 
     if update_data["for_sale"]:
         send_discord_notification(
@@ -984,105 +1355,96 @@ def sell_item(username, item_id, price):
 
 
 def buy_item(username, item_id):
-    item = items_collection.find_one({"id": item_id, "for_sale": True}, {"_id": 0})
+    # Claim the item first; only one buyer can flip for_sale
+    item = items_collection.find_one_and_update(
+        {"id": item_id, "for_sale": True, "owner": {"$ne": username}},
+        {"$set": {"owner": username, "for_sale": False, "price": 0}},
+        projection={"_id": 0, "item_secret": 0},
+    )
     if not item:
+        if items_collection.find_one(
+            {"id": item_id, "for_sale": True, "owner": username}, {"_id": 1}
+        ):
+            return (
+                jsonify(
+                    {
+                        "error": "Cannot buy your own item",
+                        "code": "cannot-buy-your-own-item",
+                    }
+                ),
+                400,
+            )
         return jsonify({"error": "Item not available", "code": "item-not-found"}), 404
 
     seller_username = item["owner"]
+    price = item["price"]
+    now = time.time()
 
-    if username == item["owner"]:
-        return (
-            jsonify(
-                {
-                    "error": "Cannot buy your own item",
-                    "code": "cannot-buy-your-own-item",
+    # Debit the buyer only if they can afford it; exp is awarded in the same write
+    result = users_collection.update_one(
+        {"username": username, "tokens": {"$gte": price}},
+        [
+            {
+                "$set": {
+                    "tokens": {"$add": ["$tokens", -price]},
+                    "items": push_expr("items", item_id),
+                    "history": push_expr(
+                        "history",
+                        {"item_id": item_id, "action": "buy", "timestamp": now},
+                        HISTORY_MAX_LENGTH,
+                    ),
+                    "exp": {"$add": ["$exp", 5]},
                 }
-            ),
-            400,
+            },
+            LEVEL_UP_STAGE,
+        ],
+    )
+    if not result.matched_count:
+        # Release the claim
+        items_collection.update_one(
+            {"id": item_id, "owner": username},
+            {"$set": {"owner": seller_username, "for_sale": True, "price": price}},
         )
-
-    buyer = users_collection.find_one({"username": username}, {"_id": 0})
-    if buyer["tokens"] < item["price"]:
         return jsonify({"error": "Not enough tokens", "code": "not-enough-tokens"}), 402
 
-    with client.start_session() as session:
-        session.start_transaction()
-        try:
-            users_collection.update_one(
-                {"username": username},
-                {"$inc": {"tokens": -item["price"]}},
-                session=session,
-            )
-            users_collection.update_one(
-                {"username": item["owner"]},
-                {"$inc": {"tokens": item["price"]}},
-                session=session,
-            )
-            users_collection.update_one(
-                {"username": item["owner"]},
-                {"$pull": {"items": item_id}},
-                session=session,
-            )
-            users_collection.update_one(
-                {"username": username},
-                {"$push": {"items": item_id}},
-                session=session,
-            )
-            items_collection.update_one(
-                {"id": item_id},
-                {"$set": {"owner": username, "for_sale": False, "price": 0}},
-                session=session,
-            )
-            session.commit_transaction()
-        except Exception as e:
-            session.abort_transaction()
-            return jsonify({"error": str(e), "code": "transaction-failed"}), 500
-
     users_collection.update_one(
-        {"username": username},
-        {
-            "$push": {
-                "history": {
-                    "item_id": item_id,
-                    "action": "buy",
-                    "timestamp": time.time(),
+        {"username": seller_username},
+        [
+            {
+                "$set": {
+                    "tokens": {"$add": ["$tokens", price]},
+                    "items": pull_expr("items", item_id),
+                    "history": push_expr(
+                        "history",
+                        {
+                            "item_id": item_id,
+                            "action": "sell_complete",
+                            "timestamp": now,
+                        },
+                        HISTORY_MAX_LENGTH,
+                    ),
+                    "exp": {"$add": ["$exp", 5]},
                 }
-            }
-        },
+            },
+            LEVEL_UP_STAGE,
+        ],
     )
-    users_collection.update_one(
-        {"username": seller_username},
+
+    invalidate_market_cache()
+
+    item_meta_collection.update_one(
+        {"id": item["meta_id"]},
         {
             "$push": {
-                "history": {
-                    "item_id": item_id,
-                    "action": "sell_complete",
-                    "timestamp": time.time(),
+                "price_history": {
+                    "$each": [{"timestamp": now, "price": price}],
+                    "$slice": -PRICE_HISTORY_MAX_LENGTH,
                 }
             }
         },
     )
 
-    meta_id = item["meta_id"]
-    meta = item_meta_collection.find_one({"id": meta_id})
-    if meta:
-        meta["price_history"].append({"timestamp": time.time(), "price": item["price"]})
-        item_meta_collection.update_one({"id": meta_id}, {"$set": meta})
-
-    add_exp(username, 5)
-    add_exp(seller_username, 5)
-
-    # Construct item name
-    name_parts = [
-        item["name"]["adjective"],
-        item["name"]["material"],
-        item["name"]["noun"],
-    ]
-    suffix = item["name"]["suffix"]
-    if suffix.strip():
-        name_parts.append(suffix)
-    name_parts.append(f"#{item['name']['number']}")
-    item_name = " ".join(name_parts)
+    item_name = item_display_name(item)
 
     send_discord_notification(
         title="Item Purchased",
@@ -1094,89 +1456,101 @@ def buy_item(username, item_id):
 
 
 def take_item(username, item_secret):
-    item = items_collection.find_one({"item_secret": item_secret})
+    # Flip ownership atomically on the item, then fix up both users' arrays
+    item = items_collection.find_one_and_update(
+        {"item_secret": item_secret},
+        {"$set": {"owner": username, "for_sale": False, "price": 0}},
+        projection={"_id": 0, "id": 1, "owner": 1},
+    )
     if not item:
         return jsonify({"error": "Invalid secret", "code": "invalid-secret"}), 404
 
+    invalidate_market_cache()
+
     previous_owner = item["owner"]
-    with client.start_session() as session:
-        session.start_transaction()
-        try:
-            # Remove from previous owner
-            users_collection.update_one(
+    now = time.time()
+    users_collection.bulk_write(
+        [
+            UpdateOne(
                 {"username": previous_owner},
-                {"$pull": {"items": item["id"]}},
-                session=session,
-            )
-            # Add to current user
-            users_collection.update_one(
+                {
+                    "$pull": {"items": item["id"]},
+                    "$push": {
+                        "history": history_entry(
+                            {
+                                "item_id": item["id"],
+                                "action": "taken_from",
+                                "timestamp": now,
+                            }
+                        )
+                    },
+                },
+            ),
+            UpdateOne(
                 {"username": username},
-                {"$push": {"items": item["id"]}},
-                session=session,
-            )
-            # Update item ownership
-            items_collection.update_one(
-                {"item_secret": item_secret},
-                {"$set": {"owner": username, "for_sale": False, "price": 0}},
-                session=session,
-            )
-            session.commit_transaction()
-        except Exception as e:
-            session.abort_transaction()
-            return jsonify({"error": str(e), "code": "transaction-failed"}), 500
-
-    users_collection.update_one(
-        {"username": username},
-        {
-            "$push": {
-                "history": {
-                    "item_id": item["id"],
-                    "action": "take",
-                    "timestamp": time.time(),
-                }
-            }
-        },
-    )
-    users_collection.update_one(
-        {"username": previous_owner},
-        {
-            "$push": {
-                "history": {
-                    "item_id": item["id"],
-                    "action": "taken_from",
-                    "timestamp": time.time(),
-                }
-            }
-        },
+                {
+                    "$push": {
+                        "items": item["id"],
+                        "history": history_entry(
+                            {"item_id": item["id"], "action": "take", "timestamp": now}
+                        ),
+                    }
+                },
+            ),
+        ]
     )
     return jsonify({"success": True})
 
 
+LEADERBOARD_PLACES = (
+    "1st",
+    "2nd",
+    "3rd",
+    "4th",
+    "5th",
+    "6th",
+    "7th",
+    "8th",
+    "9th",
+    "10th",
+)
+
+# Leaderboard cache: (expires_at, encoded response body)
+_leaderboard_cache = (0, None)
+
+
+def invalidate_leaderboard_cache():
+    global _leaderboard_cache
+    _leaderboard_cache = (0, None)
+
+
 def get_leaderboard():
-    pipeline = [
-        {"$match": {"banned": {"$ne": True}}},
-        {"$sort": {"tokens": DESCENDING}},
-        {"$limit": 10},
-        {
-            "$project": {
-                "_id": 0,
-                "username": 1,
-                "tokens": 1,
-            }
-        },
-    ]
-    results = list(users_collection.aggregate(pipeline))
+    global _leaderboard_cache
+    now = time.time()
+    expires_at, body = _leaderboard_cache
+    if body is None or expires_at <= now:
+        pipeline = [
+            {"$match": {"banned": {"$ne": True}}},
+            {"$sort": {"tokens": DESCENDING}},
+            {"$limit": len(LEADERBOARD_PLACES)},
+            {
+                "$project": {
+                    "_id": 0,
+                    "username": 1,
+                    "tokens": 1,
+                }
+            },
+        ]
+        results = list(users_collection.aggregate(pipeline))
 
-    def ordinal(n):
-        return "%d%s" % (
-            n,
-            "tsnrhtdd"[((n // 10 % 10 != 1) * (n % 10 < 4) * n % 10) :: 4],
-        )
+        for place, item in zip(LEADERBOARD_PLACES, results):
+            item["place"] = place
 
-    for i, item in enumerate(results):
-        item["place"] = ordinal(i + 1)
+        # Serialize once per TTL through the same provider jsonify() uses
+        body = app.json.dumps({"leaderboard": results})
+        _leaderboard_cache = (now + LEADERBOARD_CACHE_TTL, body)
 
-    return jsonify({"leaderboard": results})
+    return Response(body, mimetype="application/json")
 
 
 # Admin/Mod Functions
@@ -1195,19 +1569,19 @@ def reset_cooldowns(username):
 
 
 def edit_tokens(username, tokens):
-    try:
-        tokens = float(tokens)
-    except ValueError:
+    tokens = _to_float(tokens)
+    if tokens is None:
         return (
             jsonify({"error": "Invalid tokens value", "code": "invalid-tokens-value"}),
             400,
         )
 
-    target_user = users_collection.find_one({"username": username})
+    target_user = users_collection.find_one_and_update(
+        {"username": username}, {"$set": {"tokens": tokens}}, projection={"_id": 1}
+    )
     if not target_user:
         return jsonify({"error": "User not found", "code": "user-not-found"}), 404
-
-    users_collection.update_one({"username": username}, {"$set": {"tokens": tokens}})
+    invalidate_leaderboard_cache()
 
     send_discord_notification(
         title="Tokens Edited",
@@ -1219,9 +1593,8 @@ def edit_tokens(username, tokens):
 
 
 def edit_exp(username, exp):
-    try:
-        exp = float(exp)
-    except ValueError:
+    exp = _to_float(exp)
+    if exp is None:
         return jsonify({"error": "Invalid exp value", "code": "invalid-value"}), 400
 
     if exp < 0:
@@ -1230,12 +1603,9 @@ def edit_exp(username, exp):
             400,
         )
 
-    target_user = users_collection.find_one({"username": username})
-    if not target_user:
+    if not set_exp(username, exp).matched_count:
         return jsonify({"error": "User not found", "code": "user-not-found"}), 404
 
-    set_exp(username, exp)
-
     send_discord_notification(
         title="Experience Edited",
         description=f"Admin {request.username} set {username}'s experience to {exp}",
@@ -1246,9 +1616,8 @@ def edit_exp(username, exp):
 
 
 def edit_level(username, level):
-    try:
-        level = int(level)
-    except ValueError:
+    level = _to_int(level)
+    if level is None:
         return jsonify({"error": "Invalid level value", "code": "invalid-value"}), 400
 
     if level < 1:
@@ -1259,12 +1628,9 @@ def edit_level(username, level):
             400,
         )
 
-    target_user = users_collection.find_one({"username": username})
-    if not target_user:
+    if not set_level(username, level).matched_count:
         return jsonify({"error": "User not found", "code": "user-not-found"}), 404
 
-    set_level(username, level)
-
     send_discord_notification(
         title="Level Edited",
         description=f"Admin {request.username} set {username}'s level to {level}",
@@ -1275,11 +1641,13 @@ def edit_level(username, level):
 
 
 def add_admin(username):
-    user = users_collection.find_one({"username": username})
+    user = users_collection.find_one_and_update(
+        {"username": username}, {"$set": {"type": "admin"}}, projection={"_id": 1}
+    )
     if not user:
         return jsonify({"error": "User not found", "code": "user-not-found"}), 404
 
-    users_collection.update_one({"username": username}, {"$set": {"type": "admin"}})
+    invalidate_token_cache(username)
     send_discord_notification(
         title="Admin Added",
         description=f"Admin {request.username} added {username} as an admin",
@@ -1289,11 +1657,13 @@ def add_admin(username):
 
 
 def remove_admin(username):
-    user = users_collection.find_one({"username": username})
+    user = users_collection.find_one_and_update(
+        {"username": username}, {"$set": {"type": "user"}}, projection={"_id": 1}
+    )
     if not user:
         return jsonify({"error": "User not found", "code": "user-not-found"}), 404
 
-    users_collection.update_one({"username": username}, {"$set": {"type": "user"}})
+    invalidate_token_cache(username)
     send_discord_notification(
         title="Admin Removed",
         description=f"Admin {request.username} removed {username} as an admin",
@@ -1303,11 +1673,13 @@ def remove_admin(username):
 
 
 def add_mod(username):
-    user = users_collection.find_one({"username": username})
+    user = users_collection.find_one_and_update(
+        {"username": username}, {"$set": {"type": "mod"}}, projection={"_id": 1}
+    )
     if not user:
         return jsonify({"error": "User not found", "code": "user-not-found"}), 404
 
-    users_collection.update_one({"username": username}, {"$set": {"type": "mod"}})
+    invalidate_token_cache(username)
     send_discord_notification(
         title="Mod Added",
         description=f"Admin {request.username} added {username} as a mod",
@@ -1317,11 +1689,13 @@ def add_mod(username):
 
 
 def remove_mod(username):
-    user = users_collection.find_one({"username": username})
+    user = users_collection.find_one_and_update(
+        {"username": username}, {"$set": {"type": "user"}}, projection={"_id": 1}
+    )
     if not user:
         return jsonify({"error": "User not found", "code": "user-not-found"}), 404
 
-    users_collection.update_one({"username": username}, {"$set": {"type": "user"}})
+    invalidate_token_cache(username)
     send_discord_notification(
         title="Mod Removed",
         description=f"Admin {request.username} removed {username} as a mod",
@@ -1331,46 +1705,57 @@ def remove_mod(username):
 
 
 def edit_item(item_id, new_name, new_icon, new_rarity):
-    item = items_collection.find_one({"id": item_id})
-    if not item:
-        return jsonify({"error": "Item not found", "code": "item-not-found"}), 404
+    if new_rarity == "":
+        new_rarity = None
+    if new_rarity is not None:
+        new_rarity = _to_float(new_rarity)
+        if new_rarity is None:
+            return (
+                jsonify({"error": "Invalid rarity value", "code": "invalid-value"}),
+                400,
+            )
 
     updates = {}
     if new_name:
         parts = split_name(new_name)
         # Sanitize each component
-        updates["name.adjective"] = html.escape(parts["adjective"].strip())
-        updates["name.material"] = html.escape(parts["material"].strip())
-        updates["name.noun"] = html.escape(parts["noun"].strip())
-        updates["name.suffix"] = html.escape(parts["suffix"].strip())
-        updates["name.number"] = html.escape(parts["number"].strip())
+        name = {
+            key: parts[key].strip().translate(_HTML_ESC)
+            for key in ("adjective", "material", "noun", "suffix", "number")
+        }
+        updates.update((f"name.{key}", value) for key, value in name.items())
+        # The icon isn't part of the display name, so it can be built right here
+        updates["display_name"] = format_item_name(name)
     if new_icon:
-        updates["name.icon"] = html.escape(new_icon.strip())
-    if new_rarity:
-        updates["rarity"] = float(new_rarity)
-        updates["level"] = get_level(float(new_rarity))
-
-    if updates:
-        items_collection.update_one({"id": item_id}, {"$set": updates})
-
-        item = items_collection.find_one({"id": item_id}, {"_id": 0})
-        name_parts = [
-            item["name"]["adjective"],
-            item["name"]["material"],
-            item["name"]["noun"],
-        ]
-        suffix = item["name"]["suffix"]
-        if suffix.strip():
-            name_parts.append(suffix)
-        name_parts.append(f"#{item['name']['number']}")
-        item_name = " ".join(name_parts)
+        updates["name.icon"] = new_icon.strip().translate(_HTML_ESC)
+    if new_rarity is not None:
+        updates["rarity"] = new_rarity
+        updates["level"] = get_level(new_rarity)
 
-        updates_str = ", ".join([f"{k}: {v}" for k, v in updates.items()])
-        send_discord_notification(
-            title="Item Edited",
-            description=f"Admin {request.username} edited item {item_name} (ID: {item_id}). Changes: {updates_str}",
-            color=0xFFA500,
-        )
+    if not updates:
+        if not items_collection.find_one({"id": item_id}, {"_id": 1}):
+            return jsonify({"error": "Item not found", "code": "item-not-found"}), 404
+        return jsonify({"success": True})
+
+    item = items_collection.find_one_and_update(
+        {"id": item_id},
+        {"$set": updates},
+        projection={"_id": 0, "name": 1, "display_name": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not item:
+        return jsonify({"error": "Item not found", "code": "item-not-found"}), 404
+    invalidate_market_cache()
+
+    item_name = item_display_name(item)
+    updates_str = ", ".join(
+        [f"{k}: {v}" for k, v in updates.items() if k != "display_name"]
+    )
+    send_discord_notification(
+        title="Item Edited",
+        description=f"Admin {request.username} edited item {item_name} (ID: {item_id}). Changes: {updates_str}",
+        color=0xFFA500,
+    )
 
     return jsonify({"success": True})
 
@@ -1383,6 +1768,7 @@ def delete_item(item_id):
     owner = item["owner"]
     users_collection.update_one({"username": owner}, {"$pull": {"items": item_id}})
     items_collection.delete_one({"id": item_id})
+    invalidate_market_cache()
 
     send_discord_notification(
         title="Item Deleted",
@@ -1393,23 +1779,28 @@ def delete_item(item_id):
     return jsonify({"success": True})
 
 
-def ban_user(username, length, reason):
-    user = users_collection.find_one({"username": username})
-    if not user:
-        return jsonify({"error": "User not found", "code": "user-not-found"}), 404
+def _ban_user(username, length, reason, session=None):
+    # Admins never match, so callers can rely on matched_count
+    end_time = parse_time(length)
+    return users_collection.update_one(
+        {"username": username, "type": {"$ne": "admin"}},
+        {"$set": {"banned_until": end_time, "banned_reason": reason, "banned": True}},
+        session=session,
+    )
 
-    if user.get("type") == "admin":
+
+def ban_user(username, length, reason):
+    result = _ban_user(username, length, reason)
+    invalidate_token_cache(username)
+    if not result.matched_count:
+        # Only disambiguate on failure
+        if not users_collection.find_one({"username": username}, {"_id": 1}):
+            return jsonify({"error": "User not found", "code": "user-not-found"}), 404
         return (
             jsonify({"error": "Cannot ban an admin", "code": "cannot-ban-admin"}),
             403,
         )
 
-    end_time = parse_time(length)
-
-    users_collection.update_one(
-        {"username": username},
-        {"$set": {"banned_until": end_time, "banned_reason": reason, "banned": True}},
-    )
     send_discord_notification(
         title="User Banned",
         description=f"Admin {request.username} banned {username} for {length}. Reason: {reason}",
@@ -1419,14 +1810,15 @@ def ban_user(username, length, reason):
 
 
 def unban_user(username):
-    user = users_collection.find_one({"username": username})
-    if not user:
-        return jsonify({"error": "User not found", "code": "user-not-found"}), 404
-
-    users_collection.update_one(
+    user = users_collection.find_one_and_update(
         {"username": username},
         {"$set": {"banned_until": None, "banned_reason": None, "banned": False}},
+        projection={"_id": 1},
     )
+    if not user:
+        return jsonify({"error": "User not found", "code": "user-not-found"}), 404
+
+    invalidate_token_cache(username)
     send_discord_notification(
         title="User Unbanned",
         description=f"Admin {request.username} unbanned {username}",
@@ -1436,16 +1828,16 @@ def unban_user(username):
 
 
 def mute_user(username, length):
-    user = users_collection.find_one({"username": username})
-    if not user:
-        return jsonify({"error": "User not found", "code": "user-not-found"}), 404
-
     end_time = parse_time(length)
 
-    users_collection.update_one(
+    user = users_collection.find_one_and_update(
         {"username": username},
         {"$set": {"muted_until": end_time, "muted": True}},
+        projection={"_id": 1},
     )
+    if not user:
+        return jsonify({"error": "User not found", "code": "user-not-found"}), 404
+
     send_discord_notification(
         title="User Muted",
         description=f"Admin {request.username} muted {username} for {length}",
@@ -1455,13 +1847,13 @@ def mute_user(username, length):
 
 
 def unmute_user(username):
-    user = users_collection.find_one({"username": username})
+    user = users_collection.find_one_and_update(
+        {"username": username},
+        {"$set": {"muted": False, "muted_until": None}},
+        projection={"_id": 1},
+    )
     if not user:
         return jsonify({"error": "User not found", "code": "user-not-found"}), 404
-
-    users_collection.update_one(
-        {"username": username}, {"$set": {"muted": False, "muted_until": None}}
-    )
     send_discord_notification(
         title="User Unmuted",
         description=f"Admin {request.username} unmuted {username}",
@@ -1471,11 +1863,16 @@ def unmute_user(username):
 
 
 def fine_user(username, amount):
-    user = users_collection.find_one({"username": username})
+    amount = _to_float(amount)
+    if amount is None:
+        return jsonify({"error": "Invalid amount value", "code": "invalid-value"}), 400
+
+    user = users_collection.find_one_and_update(
+        {"username": username}, {"$inc": {"tokens": -amount}}, projection={"_id": 1}
+    )
     if not user:
         return jsonify({"error": "User not found", "code": "user-not-found"}), 404
-
-    users_collection.update_one({"username": username}, {"$inc": {"tokens": -amount}})
+    invalidate_leaderboard_cache()
     send_discord_notification(
         title="User Fined",
         description=f"Admin {request.username} fined {username} {amount} tokens",
@@ -1515,6 +1912,20 @@ def set_banner(banner):
     return jsonify({"success": True})
 
 
+def insert_system_message(room_name, message, session=None):
+    messages_collection.insert_one(
+        {
+            "id": str(uuid4()),
+            "room": room_name,
+            "username": "Command Handler",
+            "message": message,
+            "timestamp": _now(),
+            "type": "system",
+        },
+        session=session,
+    )
+
+
 def parse_command(command, room_name):
     command_parts = command[1:].split(" ")
     command, *args = command_parts
@@ -1532,13 +1943,23 @@ def parse_command(command, room_name):
         amount = args[0]
         try:
             amount = int(amount)
-            messages_to_delete = (
-                messages_collection.find({"room": room_name})
+            if amount < 1:
+                raise ValueError
+            # Find the timestamp of the oldest message to delete, then delete
+            # everything from there on without pulling the documents back
+            cutoff = next(
+                messages_collection.find(
+                    {"room": room_name}, {"_id": 0, "timestamp": 1}
+                )
                 .sort("timestamp", DESCENDING)
-                .limit(amount)
+                .skip(amount - 1)
+                .limit(1),
+                None,
             )
-            ids_to_delete = [doc["_id"] for doc in messages_to_delete]
-            messages_collection.delete_many({"_id": {"$in": ids_to_delete}})
+            query = {"room": room_name}
+            if cutoff:
+                query["timestamp"] = {"$gte": cutoff["timestamp"]}
+            messages_collection.delete_many(query)
             system_message = f"Deleted {amount} messages from {room_name}"
         except ValueError:
             system_message = "Invalid amount specified for deletion"
@@ -1546,8 +1967,36 @@ def parse_command(command, room_name):
     elif command == "ban" and len(args) >= 3:
         target_username, duration, *reason_parts = args
         reason = " ".join(reason_parts)
-        ban_user(target_username, reason, duration)
         system_message = f"Banned {target_username} for {reason} ({duration})"
+        # Apply the ban and announce it atomically
+        try:
+            with client.start_session() as session:
+                # Commits on success and aborts on any error, including a
+                # failed commit
+                with session.start_transaction():
+                    result = _ban_user(
+                        target_username, duration, reason, session=session
+                    )
+                    if result.matched_count:
+                        insert_system_message(
+                            room_name, system_message, session=session
+                        )
+        except Exception as e:
+            app.logger.error(f"Failed to ban {target_username}: {str(e)}")
+            return f"Failed to ban {target_username}"
+
+        if not result.matched_count:
+            return f"Cannot ban {target_username}"
+
+        invalidate_token_cache(target_username)
+
+        send_discord_notification(
+            title="User Banned",
+            description=f"Admin {request.username} banned {target_username} for {duration}. Reason: {reason}",
+            color=0xFF0000,
+        )
+        # Already announced inside the transaction
+        system_message = None
     elif command == "mute" and len(args) == 2:
         target_username, duration = args
         mute_user(target_username, duration)
@@ -1557,6 +2006,7 @@ def parse_command(command, room_name):
         users_collection.update_one(
             {"username": target_username}, {"$set": {"banned": False}}
         )
+        invalidate_token_cache(target_username)
         system_message = f"Unbanned {target_username}"
     elif command == "unmute" and len(args) == 1:
         target_username = args[0]
@@ -1565,7 +2015,9 @@ def parse_command(command, room_name):
     elif command == "sudo" and len(args) >= 2:
         sudo_username = args[0]
         sudo_message = " ".join(args[1:])
-        sudo_user = users_collection.find_one({"username": sudo_username})
+        sudo_user = users_collection.find_one(
+            {"username": sudo_username}, {"_id": 0, "type": 1}
+        )
         if not sudo_user:
             system_message = f"User {sudo_username} not found"
         else:
@@ -1580,26 +2032,40 @@ def parse_command(command, room_name):
                 }
             )
     elif command == "list_banned":
-        banned_users = users_collection.find({"banned": True})
+        banned_users = list(
+            users_collection.find(
+                {"banned": True}, {"_id": 0, "username": 1, "banned_reason": 1}
+            )
+            .sort("username", ASCENDING)
+            .limit(CHAT_LIST_LIMIT)
+        )
 
-        if len(list(banned_users)) == 0:
+        if not banned_users:
             system_message = "Nobody is banned."
         else:
             banned_users_list = "\n".join(
                 [
-                    f"{user['username']} - {user.get("banned_reason", "No reason provided")}"
+                    f"{user['username']} - {user.get('banned_reason') or 'No reason provided'}"
                     for user in banned_users
                 ]
             )
             system_message = "Banned users:\n" + banned_users_list
+            if len(banned_users) == CHAT_LIST_LIMIT:
+                system_message += f"\n(showing the first {CHAT_LIST_LIMIT})"
     elif command == "list_frozen":
-        frozen_users = users_collection.find({"frozen": True})
+        frozen_users = list(
+            users_collection.find({"frozen": True}, {"_id": 0, "username": 1})
+            .sort("username", ASCENDING)
+            .limit(CHAT_LIST_LIMIT)
+        )
 
-        if len(list(frozen_users)) == 0:
+        if not frozen_users:
             system_message = "Nobody is frozen."
         else:
-            frozen_users_list = "\n".join([user["username"] for user in frozen_users])
+            frozen_users_list = "\n".join(user["username"] for user in frozen_users)
             system_message = "Frozen users:\n" + frozen_users_list
+            if len(frozen_users) == CHAT_LIST_LIMIT:
+                system_message += f"\n(showing the first {CHAT_LIST_LIMIT})"
     elif command == "help":
         system_message = "Available commands: /clear_chat, /clear_user <username>, /delete_many <amount>, /ban <username> <duration> <reason>, /mute <username> <duration>, /unban <username>, /unmute <username>, /sudo <username> <message>, /list_banned, /list_frozen, /help"
     else:
@@ -1609,7 +2075,9 @@ def parse_command(command, room_name):
 
 
 def send_message(room_name, message_content, username):
-    user = users_collection.find_one({"username": username})
+    user = users_collection.find_one(
+        {"username": username}, {"_id": 0, "muted": 1, "type": 1}
+    )
     if user["muted"]:
         return jsonify({"error": "You are muted", "code": "user-muted"}), 400
 
@@ -1619,11 +2087,11 @@ def send_message(room_name, message_content, username):
             400,
         )
 
-    if not re.match(r"^[a-zA-Z0-9_-]{1,50}$", room_name):
+    if not _ROOM_RE.match(room_name):
         return jsonify({"error": "Invalid room name", "code": "invalid-room"}), 400
 
     sanitized_message = html.escape(message_content.strip())
-    sanitized_message = profanity.censor(sanitized_message)
+    sanitized_message = censor_profanity(sanitized_message)
     if len(sanitized_message) == 0:
         return (
             jsonify({"error": "Message cannot be empty", "code": "empty-message"}),
@@ -1632,8 +2100,9 @@ def send_message(room_name, message_content, username):
     if len(sanitized_message) > 100:
         return jsonify({"error": "Message too long", "code": "message-too-long"}), 400
 
-    if not rooms_collection.find_one({"name": room_name}):
-        rooms_collection.insert_one({"name": room_name})
+    rooms_collection.update_one(
+        {"name": room_name}, {"$setOnInsert": {"name": room_name}}, upsert=True
+    )
 
     system_message = None
     if user["type"] == "admin" and sanitized_message.startswith("/"):
@@ -1645,62 +2114,84 @@ def send_message(room_name, message_content, username):
                 "room": room_name,
                 "username": username,
                 "message": sanitized_message,
-                "timestamp": time.time(),
+                "timestamp": _now(),
                 "type": user["type"],
             }
         )
 
     if system_message:
-        messages_collection.insert_one(
-            {
-                "id": str(uuid4()),
-                "room": room_name,
-                "username": "Command Handler",
-                "message": system_message,
-                "timestamp": time.time(),
-                "type": "system",
-            }
-        )
+        insert_system_message(room_name, system_message)
     return jsonify({"success": True})
 
 
-def get_messages(room_name):
+def get_messages(room_name, before=None, limit=None):
     if not room_name:
         return (
             jsonify({"error": "Missing room parameter", "code": "missing-parameters"}),
             400,
         )
 
-    messages = messages_collection.find({"room": room_name}, {"_id": 0}).sort(
-        "timestamp", ASCENDING
-    )
-    return jsonify({"messages": list(messages)})
+    query = {"room": room_name}
+    if before is not None:
+        before = _to_float(before)
+        if before is None:
+            return (
+                jsonify({"error": "Invalid before value", "code": "invalid-value"}),
+                400,
+            )
+        query["timestamp"] = {"$lt": before}
 
+    page_size = MESSAGES_PAGE_SIZE
+    if limit is not None:
+        limit = _to_int(limit)
+        if limit is None or limit < 1:
+            return (
+                jsonify({"error": "Invalid limit value", "code": "invalid-value"}),
+                400,
+            )
+        page_size = min(limit, MESSAGES_PAGE_SIZE)
 
-def get_stats():
-    accounts_cursor = users_collection.find()
-    items_cursor = items_collection.find()
-    mods_cursor = users_collection.find({"type": "mod"})
-    admins_cursor = users_collection.find({"type": "admin"})
-    users_cursor = users_collection.find({"type": "user"})
+    # Newest page first off the {room, timestamp} index, returned oldest first
+    messages = list(
+        messages_collection.find(query, {"_id": 0})
+        .sort("timestamp", DESCENDING)
+        .limit(page_size)
+    )
+    messages.reverse()
+    return jsonify({"messages": messages})
 
-    accounts = list(accounts_cursor)
-    admins = list(admins_cursor)
-    mods = list(mods_cursor)
-    users = list(users_cursor)
-    items = list(items_cursor)
 
-    total_tokens = sum(user["tokens"] for user in accounts)
+def get_stats():
+    # Count and sum server-side; only one small document per account type comes back
+    groups = list(
+        users_collection.aggregate(
+            [
+                {
+                    "$group": {
+                        "_id": "$type",
+                        "count": {"$sum": 1},
+                        "tokens": {"$sum": "$tokens"},
+                    }
+                }
+            ]
+        )
+    )
+    counts = {group["_id"]: group["count"] for group in groups}
+    total_accounts = sum(group["count"] for group in groups)
+    total_tokens = sum(group["tokens"] for group in groups)
 
     return jsonify(
         {
             "stats": [
-                {"name": "Total Accounts", "value": len(accounts)},
-                {"name": "Total Admins", "value": len(admins)},
-                {"name": "Total Mods", "value": len(mods)},
-                {"name": "Total Users", "value": len(users)},
+                {"name": "Total Accounts", "value": total_accounts},
+                {"name": "Total Admins", "value": counts.get("admin", 0)},
+                {"name": "Total Mods", "value": counts.get("mod", 0)},
+                {"name": "Total Users", "value": counts.get("user", 0)},
                 {"name": "Total Tokens", "value": total_tokens},
-                {"name": "Total Items", "value": len(items)},
+                {
+                    "name": "Total Items",
+                    "value": items_collection.estimated_document_count(),
+                },
             ]
         }
     )
@@ -1717,14 +2208,47 @@ def get_banner():
 
 
 # Static files
+@lru_cache(maxsize=64)
+def load_static_file(path, mtime):
+    # mtime is part of the cache key so edited files are picked up
+    with open(path, "rb") as f:
+        body = f.read()
+    mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return body, sha1(body).hexdigest(), mimetype
+
+
+def serve_static(path):
+    full_path = safe_join("static", path)
+    try:
+        file_stat = os.stat(full_path) if full_path else None
+    except OSError:
+        file_stat = None
+    # Large, missing or unsafe paths go through Flask's regular file handling
+    if (
+        not file_stat
+        or not S_ISREG(file_stat.st_mode)
+        or file_stat.st_size > STATIC_CACHE_MAX_FILE_SIZE
+    ):
+        return send_from_directory("static", path)
+
+    body, etag, mimetype = load_static_file(full_path, file_stat.st_mtime)
+    response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    response.cache_control.public = True
+    # Assets are referenced by unversioned names, so browsers must revalidate
+    # every time; an unchanged file costs a 304 against the ETag
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
 @app.route("/")
 def index():
-    return send_from_directory("static", "index.html")
+    return serve_static("index.html")
 
 
 @app.route("/<path:path>")
 def static_file(path):
-    return send_from_directory("static", path)
+    return serve_static(path)
 
 
 @app.route("/api/register", methods=["POST"])
@@ -1775,15 +2299,14 @@ def disable_2fa_endpoint():
 @app.route("/api/account", methods=["GET"])
 @requires_unbanned
 def account_endpoint():
-    update_account(request.username)
-
-    user = users_collection.find_one({"username": request.username})
+    user = update_account(request.username)
+    if not user:
+        return jsonify({"error": "User not found", "code": "user-not-found"}), 404
 
-    items = items_collection.find({"id": {"$in": user["items"]}}, {"_id": 0})
-    user_items = [item for item in items]
-    
-    pets = pets_collection.find({"id": {"$in": user["pets"]}}, {"_id": 0})
-    user_pets = [pet for pet in pets]
+    user_items = list(
+        items_collection.find({"id": {"$in": user["items"]}}, {"_id": 0})
+    )
+    user_pets = list(pets_collection.find({"id": {"$in": user["pets"]}}, {"_id": 0}))
 
     return jsonify(
         {
@@ -1892,8 +2415,10 @@ def send_message_endpoint():
 def get_messages_endpoint():
     data = request.args
     room = data.get("room", "global")
+    before = data.get("before")
+    limit = data.get("limit")
 
-    return get_messages(room)
+    return get_messages(room, before, limit)
 
 
 @app.route("/api/get_banner", methods=["GET"])
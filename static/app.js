@@ -962,7 +962,16 @@ function refreshGlobalMessages() {
 
         console.debug(globalMessages);
 
-        if (data.messages.length === globalMessages.length) {
+        // Only the latest page is returned, so compare its ends as well as its size
+        const first = data.messages[0];
+        const last = data.messages[data.messages.length - 1];
+        const prevFirst = globalMessages[0];
+        const prevLast = globalMessages[globalMessages.length - 1];
+        if (
+          data.messages.length === globalMessages.length &&
+          (first && first.id) === (prevFirst && prevFirst.id) &&
+          (last && last.id) === (prevLast && prevLast.id)
+        ) {
           console.log('No new messages');
           return;
         }